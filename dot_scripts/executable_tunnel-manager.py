@@ -5,14 +5,50 @@ Manage Cloudflare tunnels with background process support
 """
 
 import os
+import re
 import sys
 import subprocess
 import signal
+import select
 import time
 import json
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, Iterator, List, Dict, FrozenSet, Optional, Tuple
+
+# Linux exposes process info under /proc; elsewhere (macOS) fall back to ps/pgrep
+HAS_PROC = os.path.isdir("/proc/self")
+
+# Matches "cloudflared ... tunnel ... run <name>" and captures the tunnel name
+TUNNEL_RUN_RE = re.compile(rb"cloudflared.*\btunnel\b.*\brun\b.*?(\S+)\s*$")
+
+# Captures the path given to --config on a cloudflared command line
+CONFIG_ARG_RE = re.compile(rb"\s--config(?:=|\s+)(\S+)")
+
+# Picks the local port, hostname and tunnel ID out of a tunnel config in one pass
+CONFIG_FIELDS_RE = re.compile(
+    r'service:\s*http://localhost:(?P<port>\d+)'
+    r'|hostname:\s*(?P<url>\S+)'
+    r'|credentials-file:.*/(?P<tunnel_id>[0-9a-f-]+)\.json'
+)
+CREATED_ID_RE = re.compile(r'Created tunnel \S+ with id ([0-9a-f-]+)')
+
+# How long tunnel list results are reused before asking cloudflared again
+TUNNEL_CACHE_TTL = 30.0
+
+# Per-tunnel cloudflared config written by create/update
+CONFIG_TEMPLATE = """tunnel: {name}
+credentials-file: {credentials}
+origincert: {origincert}
+
+ingress:
+  - hostname: {url}
+    service: http://localhost:{port}
+  - service: http_status:404
+"""
 
 class Colors:
     """ANSI color codes for terminal output"""
@@ -25,26 +61,124 @@ class Colors:
     ENDC = '\033[0m'
     BOLD = '\033[1m'
 
+# Interactive menu text and prompts, formatted once at import
+MENU_TEXT = (
+    f"\n{Colors.BOLD}{Colors.CYAN}=== Cloudflare Tunnel Manager ==={Colors.ENDC}\n"
+    "1. List all tunnels\n"
+    "2. Start a tunnel\n"
+    "3. Stop a tunnel\n"
+    "4. Restart a tunnel\n"
+    "5. View tunnel logs\n"
+    "6. Create a new tunnel\n"
+    "7. Update a tunnel\n"
+    "8. Delete a tunnel\n"
+    "9. Exit\n"
+)
+PROMPT_MENU_CHOICE = f"\n{Colors.BOLD}Select option (1-9): {Colors.ENDC}"
+PROMPT_TUNNEL_NAME = f"{Colors.BOLD}Enter tunnel name: {Colors.ENDC}"
+PROMPT_PORT = f"{Colors.BOLD}Enter local port number: {Colors.ENDC}"
+PROMPT_DOMAIN = f"{Colors.BOLD}Enter domain: {Colors.ENDC}"
+PROMPT_AUTO_START = f"{Colors.BOLD}Start tunnel after creation? (Y/n): {Colors.ENDC}"
+PROMPT_CONFIG_PATH = f"{Colors.BOLD}Config file path (press Enter to skip): {Colors.ENDC}"
+PROMPT_URL = f"{Colors.BOLD}Enter URL (e.g., app.example.com): {Colors.ENDC}"
+PROMPT_TUNNEL_CHOICE = f"\n{Colors.BOLD}Enter tunnel number or name: {Colors.ENDC}"
+PROMPT_STOP_TUNNEL = f"{Colors.BOLD}Enter tunnel name to stop: {Colors.ENDC}"
+PROMPT_RESTART_TUNNEL = f"{Colors.BOLD}Enter tunnel name to restart: {Colors.ENDC}"
+PROMPT_LOG_LINES = f"{Colors.BOLD}Number of lines (default 50): {Colors.ENDC}"
+PROMPT_UPDATE_TUNNEL = f"{Colors.BOLD}Enter tunnel name to update: {Colors.ENDC}"
+PROMPT_RESTART_AFTER_UPDATE = f"{Colors.BOLD}Restart tunnel after update? (Y/n): {Colors.ENDC}"
+PROMPT_DELETE_TUNNEL = f"{Colors.BOLD}Enter tunnel name to delete: {Colors.ENDC}"
+PROMPT_DELETE_CHOICE = f"\n{Colors.BOLD}Select tunnel to delete (number or name): {Colors.ENDC}"
+
+def base_domain(url: str) -> Optional[str]:
+    """Extract the base domain from a URL (e.g., "subdomain.example.com" -> "example.com")"""
+    parts = url.rsplit('.', 2)[-2:]
+    if len(parts) < 2 or not all(parts):
+        return None
+    return '.'.join(parts)
+
+def parse_pos_int(value: str) -> Optional[int]:
+    """Parse a positive integer from user input, or None if it isn't one"""
+    try:
+        number = int(value)
+    except ValueError:
+        return None
+    return number if number > 0 else None
+
+def port_number(value: str) -> int:
+    """argparse type for a local port (1-65535), also used by the interactive prompts"""
+    port = parse_pos_int(value)
+    if port is None or port > 65535:
+        raise argparse.ArgumentTypeError(f"Invalid port number: {value.strip()!r} (expected 1-65535)")
+    return port
+
+def line_count(value: str) -> int:
+    """argparse type for a positive number of log lines"""
+    count = parse_pos_int(value)
+    if count is None:
+        raise argparse.ArgumentTypeError(f"Invalid line count: {value.strip()!r} (expected a positive number)")
+    return count
+
+@lru_cache(maxsize=4)
+def _scan_cert_files(dir_path: str, mtime_ns: int) -> Tuple[str, ...]:
+    """Scan a directory for cert files
+    
+    mtime_ns is only part of the cache key, so results are rescanned once the
+    directory changes (e.g. after a login).
+    """
+    with os.scandir(dir_path) as entries:
+        return tuple(
+            entry.name for entry in entries
+            if entry.name == "cert.pem"
+            or (entry.name.endswith("-cert.pem") and not entry.name.startswith('.'))
+        )
+
+def list_cert_files(cert_dir: Path) -> Tuple[str, ...]:
+    """List the names of cert.pem and *-cert.pem files in a directory"""
+    try:
+        return _scan_cert_files(str(cert_dir), os.stat(cert_dir).st_mtime_ns)
+    except OSError:
+        return ()
+
+def parse_tunnel_config(content: str) -> Tuple[Optional[int], Optional[str], Optional[str]]:
+    """Extract (port, url, tunnel_id) from a tunnel config, using the first match of each"""
+    fields = {}
+    for match in CONFIG_FIELDS_RE.finditer(content):
+        field = match.lastgroup
+        if field not in fields:
+            fields[field] = match.group(field)
+            if len(fields) == 3:
+                break
+    
+    port = int(fields['port']) if 'port' in fields else None
+    return port, fields.get('url'), fields.get('tunnel_id')
+
 class TunnelManager:
     def __init__(self, cert_file: Optional[str] = None, auto_select_cert: bool = True):
         self.pid_dir = Path("/tmp")
         self.config_dir = Path.home() / ".cloudflared"
         self.cert_file = cert_file
+        self._tunnels_cache: Optional[List[Dict]] = None
+        self._cache_time = 0.0
+        # Tunnel name -> (fetch time, tunnel or None if known not to exist),
+        # filled by list_tunnels() or by per-name lookups in _find_tunnel()
+        self._by_name: Dict[str, Tuple[float, Optional[Dict]]] = {}
+        # Tunnel name -> PID for tunnels started (and so parented) by this process
+        self._started_pids: Dict[str, int] = {}
         
         # If no cert specified, try to find one
         if not self.cert_file and auto_select_cert:
-            # Check for default cert.pem first
-            default_cert = self.config_dir / "cert.pem"
-            if default_cert.exists():
-                self.cert_file = str(default_cert)
-            else:
-                # Look for any .pem file
-                cert_files = list(self.config_dir.glob("*-cert.pem"))
-                if cert_files:
-                    self.cert_file = str(cert_files[0])
-                    if len(cert_files) > 1:
-                        print(f"{Colors.YELLOW}Multiple cert files found. Using: {cert_files[0].name}{Colors.ENDC}")
-                        print(f"Available certs: {', '.join(f.name for f in cert_files)}")
+            all_cert_names = list_cert_files(self.config_dir)
+            cert_names = [name for name in all_cert_names if name.endswith("-cert.pem")]
+            
+            # Prefer the default cert.pem, otherwise use any -cert.pem file
+            if "cert.pem" in all_cert_names:
+                self.cert_file = str(self.config_dir / "cert.pem")
+            elif cert_names:
+                self.cert_file = str(self.config_dir / cert_names[0])
+                if len(cert_names) > 1:
+                    print(f"{Colors.YELLOW}Multiple cert files found. Using: {cert_names[0]}{Colors.ENDC}")
+                    print(f"Available certs: {', '.join(cert_names)}")
         
     def get_pid_file(self, tunnel_name: str) -> Path:
         """Get PID file path for a tunnel"""
@@ -54,21 +188,45 @@ class TunnelManager:
         """Get log file path for a tunnel"""
         return self.pid_dir / f"cloudflared-{tunnel_name}.log"
     
+    def _invalidate_cache(self):
+        """Drop the cached tunnel list so the next lookup queries cloudflared"""
+        self._tunnels_cache = None
+        self._by_name = {}
+    
+    def _is_fresh(self, fetch_time: float) -> bool:
+        """Check if data fetched at fetch_time is younger than TUNNEL_CACHE_TTL"""
+        return time.monotonic() - fetch_time <= TUNNEL_CACHE_TTL
+    
+    def _tunnel_cmd(self, *args: str) -> List[str]:
+        """Build a 'cloudflared tunnel' command, adding the cert file if specified"""
+        cmd = ["cloudflared", "tunnel"]
+        if self.cert_file:
+            cmd.extend(["--origincert", self.cert_file])
+        cmd.extend(args)
+        return cmd
+    
     def list_tunnels(self) -> List[Dict]:
-        """List all Cloudflare tunnels"""
+        """List all Cloudflare tunnels (cached for TUNNEL_CACHE_TTL seconds)"""
+        if self._tunnels_cache is not None and self._is_fresh(self._cache_time):
+            return self._tunnels_cache
+        
+        tunnels = self._query_tunnels()
+        if tunnels is None:
+            return []
+        
+        self._tunnels_cache = tunnels
+        self._cache_time = time.monotonic()
+        self._by_name = {t.get('name'): (self._cache_time, t) for t in tunnels}
+        return tunnels
+    
+    def _query_tunnels(self, *filters: str) -> Optional[List[Dict]]:
+        """Run 'cloudflared tunnel list' with optional filter flags. Returns None on error."""
         try:
-            cmd = ["cloudflared", "tunnel"]
-            
-            # Add cert file if specified
-            if self.cert_file:
-                cmd.extend(["--origincert", self.cert_file])
-            
-            cmd.extend(["list", "--output", "json"])
+            cmd = self._tunnel_cmd("list", *filters, "--output", "json")
             
             result = subprocess.run(
                 cmd,
                 capture_output=True,
-                text=True,
                 check=True
             )
             tunnels = json.loads(result.stdout)
@@ -76,66 +234,212 @@ class TunnelManager:
         except subprocess.CalledProcessError as e:
             print(f"{Colors.RED}Error listing tunnels: {e}{Colors.ENDC}")
             if e.stderr:
-                print(f"{Colors.RED}Error details: {e.stderr}{Colors.ENDC}")
-            return []
+                print(f"{Colors.RED}Error details: {e.stderr.decode(errors='replace')}{Colors.ENDC}")
+            return None
         except json.JSONDecodeError:
             print(f"{Colors.RED}Error parsing tunnel list{Colors.ENDC}")
-            return []
+            return None
     
-    def is_tunnel_running(self, tunnel_name: str) -> Tuple[bool, Optional[int]]:
-        """Check if a tunnel is running and return its PID"""
-        pid_file = self.get_pid_file(tunnel_name)
+    def _find_tunnel(self, tunnel_name: str) -> Optional[Dict]:
+        """Look up a tunnel by name
         
-        if pid_file.exists():
-            try:
-                with open(pid_file, 'r') as f:
-                    pid = int(f.read().strip())
-                
-                # Check if process is actually running using kill -0
-                try:
-                    os.kill(pid, 0)
-                    # Verify it's actually a cloudflared process
-                    try:
-                        result = subprocess.run(
-                            ["ps", "-p", str(pid), "-o", "comm="],
-                            capture_output=True,
-                            text=True
-                        )
-                        if 'cloudflared' in result.stdout:
-                            return True, pid
-                    except:
-                        pass
-                except (OSError, ProcessLookupError):
-                    # Process doesn't exist
-                    pass
-                
-                # PID file exists but process is not running
-                pid_file.unlink()
-            except (ValueError, IOError):
-                if pid_file.exists():
-                    pid_file.unlink()
+        Unless the full list is already cached, cloudflared is asked to filter
+        by name so only the matching tunnel is sent back and parsed.
+        """
+        cached = self._by_name.get(tunnel_name)
+        if cached and self._is_fresh(cached[0]):
+            return cached[1]
+        if self._tunnels_cache is not None and self._is_fresh(self._cache_time):
+            # Not in a fresh full list, so it doesn't exist
+            return None
+        
+        tunnels = self._query_tunnels("--name", tunnel_name)
+        if tunnels is None:
+            return None
+        tunnel = next((t for t in tunnels if t.get('name') == tunnel_name), None)
+        self._by_name[tunnel_name] = (time.monotonic(), tunnel)
+        return tunnel
+    
+    def tunnel_exists(self, tunnel_name: str) -> bool:
+        """Check if a tunnel with the given name exists"""
+        return self._find_tunnel(tunnel_name) is not None
+    
+    def is_tunnel_running(self, tunnel_name: str, snapshot: Optional[Dict[str, int]] = None) -> Tuple[bool, Optional[int]]:
+        """Check if a tunnel is running and return its PID
+        
+        If a snapshot from _scan_cloudflared_processes() is given, it is used
+        instead of searching the process table again.
+        """
+        pid, _ = self._probe_pidfile(tunnel_name)
+        if pid:
+            return True, pid
         
         # Also check for any cloudflared processes running this tunnel
+        if snapshot is not None:
+            pid = snapshot.get(tunnel_name)
+        else:
+            pid = self._find_tunnel_process(tunnel_name)
+        if pid:
+            return True, pid
+        
+        return False, None
+    
+    def _read_pid(self, pid_file: Path) -> int:
+        """Read a PID file with a single read() syscall"""
+        fd = os.open(pid_file, os.O_RDONLY)
+        try:
+            return int(os.read(fd, 32).strip())
+        finally:
+            os.close(fd)
+    
+    def _write_pid(self, pid_file: Path, pid: int):
+        """Write a PID file with a single write() syscall
+        
+        Writes to a temp file and renames it so readers never see a partial file.
+        """
+        tmp_pid_file = pid_file.with_name(pid_file.name + '.tmp')
+        fd = os.open(tmp_pid_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, f"{pid}\n".encode())
+        finally:
+            os.close(fd)
+        os.replace(tmp_pid_file, pid_file)
+    
+    def _probe_pidfile(self, tunnel_name: str) -> Tuple[Optional[int], bool]:
+        """Read a tunnel's PID file without modifying it
+        
+        Returns (pid, is_stale): pid is set if the recorded process is a running
+        cloudflared, is_stale is True if the file is unreadable or points at a
+        process that is gone.
+        """
         try:
+            pid = self._read_pid(self.get_pid_file(tunnel_name))
+        except FileNotFoundError:
+            return None, False
+        except (ValueError, IOError):
+            return None, True
+        
+        # Tunnels we spawned stay zombies (still named cloudflared) after they
+        # exit until reaped, so collect them before checking the process
+        if self._started_pids.get(tunnel_name) == pid:
+            try:
+                exited = os.waitpid(pid, os.WNOHANG) != (0, 0)
+            except ChildProcessError:
+                exited = True
+            if exited:
+                self._started_pids.pop(tunnel_name, None)
+                return None, True
+        
+        # Check if process is actually running and is cloudflared
+        if self._is_cloudflared_pid(pid):
+            return pid, False
+        return None, True
+    
+    def _reap_stale_pidfiles(self, tunnel_names):
+        """Remove PID files left behind by tunnels that are no longer running"""
+        for tunnel_name in tunnel_names:
+            _, is_stale = self._probe_pidfile(tunnel_name)
+            if is_stale:
+                self.get_pid_file(tunnel_name).unlink(missing_ok=True)
+    
+    def _is_cloudflared_pid(self, pid: int) -> bool:
+        """Check if a PID belongs to a running cloudflared process"""
+        if HAS_PROC:
+            try:
+                with open(f"/proc/{pid}/comm", 'r') as f:
+                    return 'cloudflared' in f.read()
+            except OSError:
+                return False
+        
+        try:
+            os.kill(pid, 0)
             result = subprocess.run(
-                ["pgrep", "-f", f"cloudflared.*tunnel.*run.*{tunnel_name}"],
+                ["ps", "-p", str(pid), "-o", "comm="],
                 capture_output=True,
                 text=True
             )
-            if result.returncode == 0 and result.stdout.strip():
-                pids = result.stdout.strip().split('\n')
-                if pids and pids[0]:
-                    return True, int(pids[0])
+            return 'cloudflared' in result.stdout
         except:
-            pass
+            return False
+    
+    def _find_tunnel_process(self, tunnel_name: str) -> Optional[int]:
+        """Find the PID of a cloudflared process running the given tunnel"""
+        if not HAS_PROC:
+            try:
+                result = subprocess.run(
+                    ["pgrep", "-f", f"cloudflared.*tunnel.*run.*{re.escape(tunnel_name)}"],
+                    capture_output=True,
+                    text=True
+                )
+                pids = result.stdout.split()
+                if result.returncode == 0 and pids:
+                    return int(pids[0])
+            except:
+                pass
+            return None
         
-        return False, None
+        pattern = re.compile(rb"cloudflared.*tunnel.*run.*" + re.escape(tunnel_name.encode()))
+        own_pid = os.getpid()
+        with os.scandir("/proc") as entries:
+            for entry in entries:
+                if not entry.name.isdigit() or int(entry.name) == own_pid:
+                    continue
+                try:
+                    with open(f"/proc/{entry.name}/cmdline", 'rb') as f:
+                        cmdline = f.read().replace(b"\0", b" ")
+                except OSError:
+                    continue
+                if pattern.search(cmdline):
+                    return int(entry.name)
+        return None
+    
+    def running_tunnels(self) -> FrozenSet[str]:
+        """Names of all tunnels with a running cloudflared process, from one process scan"""
+        return frozenset(self._scan_cloudflared_processes())
+    
+    def _scan_cloudflared_processes(self) -> Dict[str, int]:
+        """Map tunnel name -> PID for every running 'cloudflared tunnel run' process"""
+        running = {}
+        for tunnel_name, pid, _ in self._iter_cloudflared_processes():
+            running.setdefault(tunnel_name, pid)
+        return running
+    
+    def _iter_cloudflared_processes(self) -> Iterator[Tuple[str, int, bytes]]:
+        """Yield (tunnel name, PID, command line) for every running 'cloudflared tunnel run' process"""
+        if not HAS_PROC:
+            try:
+                result = subprocess.run(
+                    ["ps", "-axo", "pid=,command="],
+                    capture_output=True
+                )
+            except:
+                return
+            for line in result.stdout.splitlines():
+                pid, _, command = line.strip().partition(b" ")
+                match = TUNNEL_RUN_RE.search(command)
+                if match and pid.isdigit():
+                    yield match.group(1).decode(), int(pid), command
+            return
+        
+        with os.scandir("/proc") as entries:
+            for entry in entries:
+                if not entry.name.isdigit():
+                    continue
+                try:
+                    with open(f"/proc/{entry.name}/cmdline", 'rb') as f:
+                        cmdline = f.read().replace(b"\0", b" ")
+                except OSError:
+                    continue
+                match = TUNNEL_RUN_RE.search(cmdline)
+                if match:
+                    yield match.group(1).decode(), int(entry.name), cmdline
     
-    def start_tunnel(self, tunnel_name: str, config_file: Optional[str] = None) -> bool:
+    def start_tunnel(self, tunnel_name: str, config_file: Optional[str] = None, out: Callable[[str], None] = print) -> bool:
         """Start a tunnel in the background"""
+        self._reap_stale_pidfiles([tunnel_name])
         running, pid = self.is_tunnel_running(tunnel_name)
         if running:
-            print(f"{Colors.YELLOW}Tunnel '{tunnel_name}' is already running (PID: {pid}){Colors.ENDC}")
+            out(f"{Colors.YELLOW}Tunnel '{tunnel_name}' is already running (PID: {pid}){Colors.ENDC}")
             return False
         
         pid_file = self.get_pid_file(tunnel_name)
@@ -147,8 +451,8 @@ class TunnelManager:
             if default_config.exists():
                 config_file = str(default_config)
             else:
-                print(f"{Colors.YELLOW}Warning: No config file found for tunnel '{tunnel_name}'{Colors.ENDC}")
-                print(f"Expected at: {default_config}")
+                out(f"{Colors.YELLOW}Warning: No config file found for tunnel '{tunnel_name}'{Colors.ENDC}")
+                out(f"Expected at: {default_config}")
         
         # Build command
         cmd = ["cloudflared", "tunnel"]
@@ -159,62 +463,137 @@ class TunnelManager:
         try:
             # Start process in background
             with open(log_file, 'w') as log:
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=log,
-                    stderr=subprocess.STDOUT,
-                    start_new_session=True
-                )
+                pid = self._spawn_detached(cmd, log)
             
             # Save PID
-            with open(pid_file, 'w') as f:
-                f.write(str(process.pid))
+            self._write_pid(pid_file, pid)
             
-            # Wait a moment to check if it started successfully
-            time.sleep(2)
+            # Wait a moment to check if it started successfully, returning
+            # early if the process dies
+            try:
+                self._pidfd_wait(pid, 2)
+            except (AttributeError, OSError):
+                time.sleep(2)
             
-            if process.poll() is None:
-                print(f"{Colors.GREEN}✓ Started tunnel '{tunnel_name}' (PID: {process.pid}){Colors.ENDC}")
-                print(f"  Log file: {log_file}")
+            if os.waitpid(pid, os.WNOHANG) == (0, 0):
+                self._started_pids[tunnel_name] = pid
+                out(f"{Colors.GREEN}✓ Started tunnel '{tunnel_name}' (PID: {pid}){Colors.ENDC}")
+                out(f"  Log file: {log_file}")
                 return True
             else:
-                print(f"{Colors.RED}✗ Failed to start tunnel '{tunnel_name}'{Colors.ENDC}")
-                print(f"  Check log file: {log_file}")
+                out(f"{Colors.RED}✗ Failed to start tunnel '{tunnel_name}'{Colors.ENDC}")
+                out(f"  Check log file: {log_file}")
                 if pid_file.exists():
                     pid_file.unlink()
                 return False
                 
         except Exception as e:
-            print(f"{Colors.RED}Error starting tunnel: {e}{Colors.ENDC}")
+            out(f"{Colors.RED}Error starting tunnel: {e}{Colors.ENDC}")
             if pid_file.exists():
                 pid_file.unlink()
             return False
     
-    def stop_tunnel(self, tunnel_name: str) -> bool:
+    def _spawn_detached(self, cmd: List[str], log) -> int:
+        """Start a command in a new session with output sent to log, returning its PID"""
+        try:
+            # posix_spawn avoids copying the interpreter's address space like fork() does
+            return os.posix_spawnp(
+                cmd[0],
+                cmd,
+                os.environ,
+                file_actions=[
+                    (os.POSIX_SPAWN_DUP2, log.fileno(), 1),
+                    (os.POSIX_SPAWN_DUP2, log.fileno(), 2),
+                ],
+                setsid=True
+            )
+        except (AttributeError, NotImplementedError):
+            # posix_spawn or POSIX_SPAWN_SETSID not available on this platform
+            process = subprocess.Popen(
+                cmd,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=True
+            )
+            return process.pid
+    
+    def _pidfd_wait(self, pid: int, timeout: float) -> bool:
+        """Wait on a pidfd until the process exits or timeout seconds pass
+        
+        Returns True if it exited. Raises AttributeError/OSError where pidfds
+        are unsupported (non-Linux or kernel < 5.3).
+        """
+        fd = os.pidfd_open(pid)
+        try:
+            # pidfd becomes readable as soon as the process exits
+            poller = select.poll()
+            poller.register(fd, select.POLLIN)
+            return bool(poller.poll(int(timeout * 1000)))
+        finally:
+            os.close(fd)
+    
+    def _wait_for_exit(self, pid: int, timeout: int) -> bool:
+        """Wait up to timeout seconds for a process to exit. Returns True if it exited."""
+        try:
+            return self._pidfd_wait(pid, timeout)
+        except ProcessLookupError:
+            return True
+        except (AttributeError, OSError):
+            # No pidfd support, fall back to polling
+            for _ in range(timeout):
+                try:
+                    os.kill(pid, 0)  # Check if process still exists
+                    time.sleep(1)
+                except (OSError, ProcessLookupError):
+                    return True
+            return False
+    
+    def _reap_child(self, pid: int, timeout: int) -> bool:
+        """Wait up to timeout seconds for a child process to exit and reap it. Returns True if it exited."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if os.waitpid(pid, os.WNOHANG) != (0, 0):
+                    return True
+            except ChildProcessError:
+                # Already reaped
+                return True
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                self._pidfd_wait(pid, remaining)
+            except (AttributeError, OSError):
+                time.sleep(min(0.1, remaining))
+    
+    def stop_tunnel(self, tunnel_name: str, out: Callable[[str], None] = print) -> bool:
         """Stop a running tunnel"""
         running, pid = self.is_tunnel_running(tunnel_name)
         
         if not running:
-            print(f"{Colors.YELLOW}Tunnel '{tunnel_name}' is not running{Colors.ENDC}")
+            self._reap_stale_pidfiles([tunnel_name])
+            out(f"{Colors.YELLOW}Tunnel '{tunnel_name}' is not running{Colors.ENDC}")
             return False
         
         try:
             # Send SIGTERM for graceful shutdown
             os.kill(pid, signal.SIGTERM)
             
-            # Wait for process to terminate (max 10 seconds)
-            for _ in range(10):
-                try:
-                    os.kill(pid, 0)  # Check if process still exists
-                    time.sleep(1)
-                except (OSError, ProcessLookupError):
-                    # Process no longer exists
-                    break
+            # Our own children linger as zombies until reaped, so wait on them
+            # with waitpid; anything else (e.g. started by an earlier run) is
+            # only watched
+            if self._started_pids.pop(tunnel_name, None) == pid:
+                wait_for_exit = self._reap_child
             else:
+                wait_for_exit = self._wait_for_exit
+            
+            # Wait for process to terminate (max 10 seconds)
+            if not wait_for_exit(pid, 10):
                 # Force kill if still running
                 try:
                     os.kill(pid, signal.SIGKILL)
-                    time.sleep(1)
+                    wait_for_exit(pid, 1)
                 except:
                     pass
             
@@ -223,7 +602,7 @@ class TunnelManager:
             if pid_file.exists():
                 pid_file.unlink()
             
-            print(f"{Colors.GREEN}✓ Stopped tunnel '{tunnel_name}' (PID: {pid}){Colors.ENDC}")
+            out(f"{Colors.GREEN}✓ Stopped tunnel '{tunnel_name}' (PID: {pid}){Colors.ENDC}")
             return True
             
         except ProcessLookupError:
@@ -231,25 +610,50 @@ class TunnelManager:
             pid_file = self.get_pid_file(tunnel_name)
             if pid_file.exists():
                 pid_file.unlink()
-            print(f"{Colors.GREEN}✓ Tunnel '{tunnel_name}' stopped{Colors.ENDC}")
+            out(f"{Colors.GREEN}✓ Tunnel '{tunnel_name}' stopped{Colors.ENDC}")
             return True
         except Exception as e:
-            print(f"{Colors.RED}Error stopping tunnel: {e}{Colors.ENDC}")
+            out(f"{Colors.RED}Error stopping tunnel: {e}{Colors.ENDC}")
             return False
     
-    def restart_tunnel(self, tunnel_name: str, config_file: Optional[str] = None) -> bool:
+    def restart_tunnel(self, tunnel_name: str, config_file: Optional[str] = None, out: Callable[[str], None] = print) -> bool:
         """Restart a tunnel"""
-        print(f"{Colors.CYAN}Restarting tunnel '{tunnel_name}'...{Colors.ENDC}")
+        out(f"{Colors.CYAN}Restarting tunnel '{tunnel_name}'...{Colors.ENDC}")
         
         # Stop if running
         running, _ = self.is_tunnel_running(tunnel_name)
         if running:
-            if not self.stop_tunnel(tunnel_name):
+            if not self.stop_tunnel(tunnel_name, out=out):
                 return False
-            time.sleep(2)  # Brief pause before restart
         
         # Start tunnel
-        return self.start_tunnel(tunnel_name, config_file)
+        return self.start_tunnel(tunnel_name, config_file, out=out)
+    
+    def restart_all_tunnels(self) -> bool:
+        """Restart all running tunnels concurrently"""
+        # Tunnel name -> the config it was started with, so restarts keep it
+        running: Dict[str, Optional[str]] = {}
+        for tunnel_name, _, cmdline in self._iter_cloudflared_processes():
+            if tunnel_name not in running:
+                match = CONFIG_ARG_RE.search(cmdline)
+                running[tunnel_name] = match.group(1).decode() if match else None
+        if not running:
+            print(f"{Colors.YELLOW}No running tunnels to restart{Colors.ENDC}")
+            return False
+        
+        def restart(tunnel: Tuple[str, Optional[str]]) -> Tuple[bool, List[str]]:
+            # Collect each tunnel's messages so concurrent restarts don't interleave
+            messages = []
+            tunnel_name, config_file = tunnel
+            return self.restart_tunnel(tunnel_name, config_file, out=messages.append), messages
+        
+        # Each restart mostly waits on process exit/startup, so overlap them
+        results = []
+        with ThreadPoolExecutor(max_workers=min(16, len(running))) as executor:
+            for ok, messages in executor.map(restart, sorted(running.items())):
+                print("\n".join(messages))
+                results.append(ok)
+        return all(results)
     
     def show_status(self):
         """Show status of all tunnels"""
@@ -262,13 +666,27 @@ class TunnelManager:
         print(f"\n{Colors.BOLD}{Colors.HEADER}Cloudflare Tunnels Status{Colors.ENDC}")
         print("=" * 80)
         
-        for tunnel in tunnels:
+        # Clean up before checking so the concurrent checks below are read-only
+        self._reap_stale_pidfiles(t['name'] for t in tunnels if 'name' in t)
+        snapshot = self._scan_cloudflared_processes()
+        
+        def check(tunnel: Dict) -> Tuple[bool, Optional[int], Optional[Path]]:
+            name = tunnel.get('name', 'Unknown')
+            running, pid = self.is_tunnel_running(name, snapshot=snapshot)
+            log_file = self.get_log_file(name) if running else None
+            if log_file and not log_file.exists():
+                log_file = None
+            return running, pid, log_file
+        
+        # Check tunnels concurrently, then print in the original order
+        with ThreadPoolExecutor(max_workers=min(16, len(tunnels))) as executor:
+            statuses = list(executor.map(check, tunnels))
+        
+        for tunnel, (running, pid, log_file) in zip(tunnels, statuses):
             name = tunnel.get('name', 'Unknown')
             tunnel_id = tunnel.get('id', 'Unknown')
             created = tunnel.get('created_at', 'Unknown')
             
-            running, pid = self.is_tunnel_running(name)
-            
             status_color = Colors.GREEN if running else Colors.RED
             status_text = f"Running (PID: {pid})" if running else "Stopped"
             
@@ -277,10 +695,8 @@ class TunnelManager:
             print(f"  Created: {created}")
             print(f"  Status:  {status_color}{status_text}{Colors.ENDC}")
             
-            if running:
-                log_file = self.get_log_file(name)
-                if log_file.exists():
-                    print(f"  Log:     {log_file}")
+            if log_file:
+                print(f"  Log:     {log_file}")
         
         print("\n" + "=" * 80)
     
@@ -293,33 +709,61 @@ class TunnelManager:
             return
         
         try:
-            subprocess.run(["tail", "-n", str(lines), str(log_file)])
+            last_lines = self._read_last_lines(log_file, lines)
+            if last_lines:
+                sys.stdout.flush()
+                sys.stdout.buffer.write(b'\n'.join(last_lines) + b'\n')
+                sys.stdout.buffer.flush()
         except Exception as e:
             print(f"{Colors.RED}Error reading logs: {e}{Colors.ENDC}")
     
+    def _read_last_lines(self, path: Path, count: int, block_size: int = 8192) -> List[bytes]:
+        """Read the last lines of a file by seeking backwards from the end"""
+        if count <= 0:
+            return []
+        
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            buf = b''
+            # Read one extra newline so the first returned line is complete
+            while pos > 0 and buf.count(b'\n') <= count:
+                size = min(block_size, pos)
+                pos -= size
+                f.seek(pos)
+                buf = f.read(size) + buf
+        
+        if buf.endswith(b'\n'):
+            buf = buf[:-1]
+        if not buf:
+            return []
+        return buf.split(b'\n')[-count:]
+    
+    def _render_config(self, tunnel_name: str, tunnel_id: str, url: str, port: int) -> str:
+        """Render the cloudflared config file contents for a tunnel"""
+        return CONFIG_TEMPLATE.format(
+            name=tunnel_name,
+            credentials=f"{self.config_dir}/{tunnel_id}.json",
+            origincert=self.cert_file if self.cert_file else str(self.config_dir / "cert.pem"),
+            url=url,
+            port=port
+        )
+    
     def create_tunnel(self, tunnel_name: str, port: int, url: str, auto_start: bool = True, domain_selection: str = None) -> bool:
         """Create a new tunnel and configure it to route to a local port"""
         try:
             # First check if tunnel already exists
-            tunnels = self.list_tunnels()
-            if any(t.get('name') == tunnel_name for t in tunnels):
+            if self.tunnel_exists(tunnel_name):
                 print(f"{Colors.YELLOW}Tunnel '{tunnel_name}' already exists{Colors.ENDC}")
                 return False
             
             # Extract domain from URL if not specified
             if not domain_selection:
-                # Extract base domain from URL (e.g., "subdomain.example.com" -> "example.com")
-                import re
-                domain_match = re.search(r'([^.]+\.[^.]+)$', url)
-                if domain_match:
-                    domain_selection = domain_match.group(1)
+                domain_selection = base_domain(url)
             
             # Create the tunnel
             print(f"{Colors.CYAN}Creating tunnel '{tunnel_name}'...{Colors.ENDC}")
-            cmd = ["cloudflared", "tunnel"]
-            if self.cert_file:
-                cmd.extend(["--origincert", self.cert_file])
-            cmd.extend(["create", tunnel_name])
+            cmd = self._tunnel_cmd("create", tunnel_name)
             
             result = subprocess.run(
                 cmd,
@@ -328,25 +772,14 @@ class TunnelManager:
                 check=True
             )
             print(f"{Colors.GREEN}✓ Created tunnel '{tunnel_name}'{Colors.ENDC}")
+            self._invalidate_cache()
             
-            # Get the tunnel ID by querying the tunnel list
-            tunnel_id = None
-            cmd = ["cloudflared", "tunnel"]
-            if self.cert_file:
-                cmd.extend(["--origincert", self.cert_file])
-            cmd.extend(["list", "--output", "json"])
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            tunnels_data = json.loads(result.stdout)
-            for tunnel in tunnels_data:
-                if tunnel.get('name') == tunnel_name:
-                    tunnel_id = tunnel.get('id')
-                    break
+            # cloudflared reports the new tunnel's ID; only query the tunnel
+            # list if it couldn't be parsed from the output
+            id_match = CREATED_ID_RE.search(result.stdout + result.stderr)
+            tunnel_id = id_match.group(1) if id_match else None
+            if not tunnel_id:
+                tunnel_id = (self._find_tunnel(tunnel_name) or {}).get('id')
             
             if not tunnel_id:
                 print(f"{Colors.RED}Error: Could not find tunnel ID for '{tunnel_name}'{Colors.ENDC}")
@@ -354,26 +787,12 @@ class TunnelManager:
             
             # Create config file for the tunnel
             config_path = self.config_dir / f"{tunnel_name}.yml"
-            config_content = f"""tunnel: {tunnel_name}
-credentials-file: {self.config_dir}/{tunnel_id}.json
-origincert: {self.cert_file if self.cert_file else str(self.config_dir / "cert.pem")}
-
-ingress:
-  - hostname: {url}
-    service: http://localhost:{port}
-  - service: http_status:404
-"""
-            
-            with open(config_path, 'w') as f:
-                f.write(config_content)
+            config_path.write_text(self._render_config(tunnel_name, tunnel_id, url, port))
             print(f"{Colors.GREEN}✓ Created config file: {config_path}{Colors.ENDC}")
             
             # Try to route the tunnel DNS
             print(f"{Colors.CYAN}Attempting to create DNS route for {url}...{Colors.ENDC}")
-            cmd = ["cloudflared", "tunnel"]
-            if self.cert_file:
-                cmd.extend(["--origincert", self.cert_file])
-            cmd.extend(["route", "dns", tunnel_name, url])
+            cmd = self._tunnel_cmd("route", "dns", tunnel_name, url)
             
             dns_result = subprocess.run(
                 cmd,
@@ -445,10 +864,7 @@ ingress:
         """Delete a tunnel and its associated files"""
         try:
             # Check if tunnel exists
-            tunnels = self.list_tunnels()
-            tunnel_exists = any(t.get('name') == tunnel_name for t in tunnels)
-            
-            if not tunnel_exists:
+            if not self.tunnel_exists(tunnel_name):
                 print(f"{Colors.YELLOW}Tunnel '{tunnel_name}' does not exist{Colors.ENDC}")
                 return False
             
@@ -463,7 +879,6 @@ ingress:
                 
                 print(f"{Colors.CYAN}Stopping tunnel '{tunnel_name}'...{Colors.ENDC}")
                 self.stop_tunnel(tunnel_name)
-                time.sleep(2)  # Give it time to stop
             
             # Confirm deletion if not forced
             if not force:
@@ -474,10 +889,7 @@ ingress:
             
             # Delete the tunnel
             print(f"{Colors.CYAN}Deleting tunnel '{tunnel_name}'...{Colors.ENDC}")
-            cmd = ["cloudflared", "tunnel"]
-            if self.cert_file:
-                cmd.extend(["--origincert", self.cert_file])
-            cmd.extend(["delete", "-f", tunnel_name])
+            cmd = self._tunnel_cmd("delete", "-f", tunnel_name)
             
             result = subprocess.run(
                 cmd,
@@ -486,6 +898,7 @@ ingress:
                 check=True
             )
             print(f"{Colors.GREEN}✓ Deleted tunnel '{tunnel_name}'{Colors.ENDC}")
+            self._invalidate_cache()
             
             # Clean up config file
             config_path = self.config_dir / f"{tunnel_name}.yml"
@@ -520,14 +933,6 @@ ingress:
     def update_tunnel(self, tunnel_name: str, port: Optional[int] = None, url: Optional[str] = None, restart: bool = True) -> bool:
         """Update tunnel configuration (port and/or URL)"""
         try:
-            # Check if tunnel exists
-            tunnels = self.list_tunnels()
-            tunnel_exists = any(t.get('name') == tunnel_name for t in tunnels)
-            
-            if not tunnel_exists:
-                print(f"{Colors.YELLOW}Tunnel '{tunnel_name}' does not exist{Colors.ENDC}")
-                return False
-            
             if not port and not url:
                 print(f"{Colors.YELLOW}No updates specified. Use -p for port or -u for URL.{Colors.ENDC}")
                 return False
@@ -539,24 +944,17 @@ ingress:
                 print(f"Expected at: {config_path}")
                 return False
             
+            # Check if tunnel exists (queries cloudflared, so done after the local checks)
+            if not self.tunnel_exists(tunnel_name):
+                print(f"{Colors.YELLOW}Tunnel '{tunnel_name}' does not exist{Colors.ENDC}")
+                return False
+            
             # Read current config
             with open(config_path, 'r') as f:
                 config_content = f.read()
             
-            # Parse current values
-            import re
-            current_port = None
-            current_url = None
-            
-            # Extract current port
-            port_match = re.search(r'service:\s*http://localhost:(\d+)', config_content)
-            if port_match:
-                current_port = int(port_match.group(1))
-            
-            # Extract current URL
-            url_match = re.search(r'hostname:\s*([^\s]+)', config_content)
-            if url_match:
-                current_url = url_match.group(1)
+            # Parse current values (tunnel ID comes from the credentials file path)
+            current_port, current_url, tunnel_id = parse_tunnel_config(config_content)
             
             # Prepare updates
             new_port = port if port else current_port
@@ -575,10 +973,7 @@ ingress:
                 # First, remove the old route
                 if current_url:
                     try:
-                        cmd = ["cloudflared", "tunnel"]
-                        if self.cert_file:
-                            cmd.extend(["--origincert", self.cert_file])
-                        cmd.extend(["route", "dns", "--overwrite-dns", tunnel_name, url])
+                        cmd = self._tunnel_cmd("route", "dns", "--overwrite-dns", tunnel_name, url)
                         
                         subprocess.run(
                             cmd,
@@ -590,39 +985,16 @@ ingress:
                     except subprocess.CalledProcessError as e:
                         print(f"{Colors.YELLOW}Warning: Could not update DNS route: {e}{Colors.ENDC}")
             
-            # Get tunnel ID for the config
-            tunnel_id = None
-            cmd = ["cloudflared", "tunnel"]
-            if self.cert_file:
-                cmd.extend(["--origincert", self.cert_file])
-            cmd.extend(["list", "--output", "json"])
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            tunnels_data = json.loads(result.stdout)
-            for tunnel in tunnels_data:
-                if tunnel.get('name') == tunnel_name:
-                    tunnel_id = tunnel.get('id')
-                    break
+            # Fall back to the tunnel list if the config didn't have the ID
+            if not tunnel_id:
+                tunnel_id = (self._find_tunnel(tunnel_name) or {}).get('id')
             
             if not tunnel_id:
                 print(f"{Colors.RED}Error: Could not find tunnel ID for '{tunnel_name}'{Colors.ENDC}")
                 return False
             
             # Update config file
-            new_config_content = f"""tunnel: {tunnel_name}
-credentials-file: {self.config_dir}/{tunnel_id}.json
-origincert: {self.cert_file if self.cert_file else str(self.config_dir / "cert.pem")}
-
-ingress:
-  - hostname: {new_url}
-    service: http://localhost:{new_port}
-  - service: http_status:404
-"""
+            new_config_content = self._render_config(tunnel_name, tunnel_id, new_url, new_port)
             
             # Check if tunnel is running
             was_running, _ = self.is_tunnel_running(tunnel_name)
@@ -631,11 +1003,9 @@ ingress:
             if was_running and restart:
                 print(f"{Colors.CYAN}Stopping tunnel for config update...{Colors.ENDC}")
                 self.stop_tunnel(tunnel_name)
-                time.sleep(2)
             
             # Write new config
-            with open(config_path, 'w') as f:
-                f.write(new_config_content)
+            config_path.write_text(new_config_content)
             print(f"{Colors.GREEN}✓ Updated config file: {config_path}{Colors.ENDC}")
             
             # Restart if was running and restart requested
@@ -646,6 +1016,8 @@ ingress:
                 else:
                     print(f"{Colors.YELLOW}Failed to restart tunnel. Please start manually.{Colors.ENDC}")
             
+            self._invalidate_cache()
+            
             print(f"\n{Colors.BOLD}{Colors.GREEN}Tunnel '{tunnel_name}' updated successfully!{Colors.ENDC}")
             print(f"Configuration:")
             print(f"  Local port: {new_port}")
@@ -657,6 +1029,84 @@ ingress:
             print(f"{Colors.RED}Error updating tunnel: {e}{Colors.ENDC}")
             return False
 
+def add_list_parser(subparsers):
+    return subparsers.add_parser('list', help='List all tunnels with their status')
+
+def add_start_parser(subparsers):
+    start_parser = subparsers.add_parser('start', help='Start a tunnel in background')
+    start_parser.add_argument('tunnel', help='Tunnel name')
+    start_parser.add_argument('-c', '--config', help='Config file path (optional)')
+    return start_parser
+
+def add_stop_parser(subparsers):
+    stop_parser = subparsers.add_parser('stop', help='Stop a running tunnel')
+    stop_parser.add_argument('tunnel', help='Tunnel name')
+    return stop_parser
+
+def add_restart_parser(subparsers):
+    restart_parser = subparsers.add_parser('restart', help='Restart a tunnel')
+    restart_parser.add_argument('tunnel', nargs='?', help='Tunnel name')
+    restart_parser.add_argument('--all', action='store_true', help='Restart all running tunnels')
+    restart_parser.add_argument('-c', '--config', help='Config file path (optional)')
+    return restart_parser
+
+def add_logs_parser(subparsers):
+    logs_parser = subparsers.add_parser('logs', help='Show tunnel logs')
+    logs_parser.add_argument('tunnel', help='Tunnel name')
+    logs_parser.add_argument('-n', '--lines', type=line_count, default=50, help='Number of lines to show (default: 50)')
+    return logs_parser
+
+def add_create_parser(subparsers):
+    create_parser = subparsers.add_parser('create', help='Create a new tunnel')
+    create_parser.add_argument('tunnel', nargs='?', help='Tunnel name (will prompt if not provided)')
+    create_parser.add_argument('-p', '--port', type=port_number, help='Local port of the hosted application')
+    create_parser.add_argument('-u', '--url', help='URL to push the tunnel through (e.g., example.com or subdomain.example.com)')
+    create_parser.add_argument('-d', '--domain', help='Domain to create DNS record in (e.g., example.com)')
+    create_parser.add_argument('--no-start', action='store_true', help='Do not automatically start the tunnel after creation')
+    return create_parser
+
+def add_update_parser(subparsers):
+    update_parser = subparsers.add_parser('update', help='Update tunnel configuration')
+    update_parser.add_argument('tunnel', help='Tunnel name to update')
+    update_parser.add_argument('-p', '--port', type=port_number, help='New local port (optional)')
+    update_parser.add_argument('-u', '--url', help='New URL (optional)')
+    update_parser.add_argument('--restart', action='store_true', help='Restart tunnel after update if running')
+    return update_parser
+
+def add_delete_parser(subparsers):
+    delete_parser = subparsers.add_parser('delete', help='Delete a tunnel')
+    delete_parser.add_argument('tunnel', nargs='?', help='Tunnel name to delete (will show list if not provided)')
+    delete_parser.add_argument('-f', '--force', action='store_true', help='Force delete without confirmation')
+    return delete_parser
+
+def add_interactive_parser(subparsers):
+    return subparsers.add_parser('interactive', help='Interactive menu mode')
+
+# Subcommand name -> function adding its parser, in help display order
+SUBPARSER_BUILDERS = {
+    'list': add_list_parser,
+    'start': add_start_parser,
+    'stop': add_stop_parser,
+    'restart': add_restart_parser,
+    'logs': add_logs_parser,
+    'create': add_create_parser,
+    'update': add_update_parser,
+    'delete': add_delete_parser,
+    'interactive': add_interactive_parser,
+}
+
+def peek_command(argv: List[str]) -> Optional[str]:
+    """Find the subcommand in argv without parsing it. Returns None if help was requested."""
+    args = iter(argv)
+    for arg in args:
+        if arg in ('-h', '--help'):
+            return None
+        if arg == '--cert':
+            next(args, None)  # Skip the option's value
+        elif not arg.startswith('-'):
+            return arg
+    return None
+
 def main():
     parser = argparse.ArgumentParser(
         description="Cloudflare Tunnel Manager - Manage tunnels with background process support",
@@ -667,6 +1117,7 @@ Examples:
   %(prog)s start tunnel-name       # Start a tunnel in background
   %(prog)s stop tunnel-name        # Stop a running tunnel
   %(prog)s restart tunnel-name     # Restart a tunnel
+  %(prog)s restart --all           # Restart all running tunnels
   %(prog)s logs tunnel-name        # Show tunnel logs
   %(prog)s create tunnel-name -p 3000 -u app.example.com   # Create new tunnel
   %(prog)s create tunnel-name -p 3000 -u app.exalted.dev -d exalted.dev  # Specify domain
@@ -682,50 +1133,14 @@ Examples:
     
     subparsers = parser.add_subparsers(dest='command', help='Commands')
     
-    # List command
-    subparsers.add_parser('list', help='List all tunnels with their status')
-    
-    # Start command
-    start_parser = subparsers.add_parser('start', help='Start a tunnel in background')
-    start_parser.add_argument('tunnel', help='Tunnel name')
-    start_parser.add_argument('-c', '--config', help='Config file path (optional)')
-    
-    # Stop command
-    stop_parser = subparsers.add_parser('stop', help='Stop a running tunnel')
-    stop_parser.add_argument('tunnel', help='Tunnel name')
-    
-    # Restart command
-    restart_parser = subparsers.add_parser('restart', help='Restart a tunnel')
-    restart_parser.add_argument('tunnel', help='Tunnel name')
-    restart_parser.add_argument('-c', '--config', help='Config file path (optional)')
-    
-    # Logs command
-    logs_parser = subparsers.add_parser('logs', help='Show tunnel logs')
-    logs_parser.add_argument('tunnel', help='Tunnel name')
-    logs_parser.add_argument('-n', '--lines', type=int, default=50, help='Number of lines to show (default: 50)')
-    
-    # Create command
-    create_parser = subparsers.add_parser('create', help='Create a new tunnel')
-    create_parser.add_argument('tunnel', nargs='?', help='Tunnel name (will prompt if not provided)')
-    create_parser.add_argument('-p', '--port', type=int, help='Local port of the hosted application')
-    create_parser.add_argument('-u', '--url', help='URL to push the tunnel through (e.g., example.com or subdomain.example.com)')
-    create_parser.add_argument('-d', '--domain', help='Domain to create DNS record in (e.g., example.com)')
-    create_parser.add_argument('--no-start', action='store_true', help='Do not automatically start the tunnel after creation')
-    
-    # Update command
-    update_parser = subparsers.add_parser('update', help='Update tunnel configuration')
-    update_parser.add_argument('tunnel', help='Tunnel name to update')
-    update_parser.add_argument('-p', '--port', type=int, help='New local port (optional)')
-    update_parser.add_argument('-u', '--url', help='New URL (optional)')
-    update_parser.add_argument('--restart', action='store_true', help='Restart tunnel after update if running')
-    
-    # Delete command
-    delete_parser = subparsers.add_parser('delete', help='Delete a tunnel')
-    delete_parser.add_argument('tunnel', nargs='?', help='Tunnel name to delete (will show list if not provided)')
-    delete_parser.add_argument('-f', '--force', action='store_true', help='Force delete without confirmation')
-    
-    # Interactive mode
-    subparsers.add_parser('interactive', help='Interactive menu mode')
+    # Only build the subparser for the requested command; build them all for
+    # help output, a missing command, or an unknown one
+    command = peek_command(sys.argv[1:])
+    if command in SUBPARSER_BUILDERS:
+        builders = {command: SUBPARSER_BUILDERS[command]}
+    else:
+        builders = SUBPARSER_BUILDERS
+    command_parsers = {name: build(subparsers) for name, build in builders.items()}
     
     args = parser.parse_args()
     
@@ -753,9 +1168,16 @@ Examples:
         manager.stop_tunnel(args.tunnel)
     
     elif args.command == 'restart':
+        if args.all and (args.tunnel or args.config):
+            command_parsers['restart'].error('--all cannot be combined with a tunnel name or --config')
+        if not args.all and not args.tunnel:
+            command_parsers['restart'].error('a tunnel name or --all is required')
         if not select_certificate_interactive(manager):
             sys.exit(1)
-        manager.restart_tunnel(args.tunnel, args.config)
+        if args.all:
+            manager.restart_all_tunnels()
+        else:
+            manager.restart_tunnel(args.tunnel, args.config)
     
     elif args.command == 'logs':
         manager.tail_logs(args.tunnel, args.lines)
@@ -765,57 +1187,23 @@ Examples:
             sys.exit(1)
         
         # Interactive prompts for missing values
-        tunnel_name = args.tunnel
-        if not tunnel_name:
-            tunnel_name = input(f"{Colors.BOLD}Enter tunnel name: {Colors.ENDC}").strip()
-            if not tunnel_name:
-                print(f"{Colors.RED}Tunnel name is required{Colors.ENDC}")
-                sys.exit(1)
-        
-        port = args.port
-        if not port:
-            port_str = input(f"{Colors.BOLD}Enter local port number: {Colors.ENDC}").strip()
-            if not port_str.isdigit():
-                print(f"{Colors.RED}Invalid port number{Colors.ENDC}")
-                sys.exit(1)
-            port = int(port_str)
-        
-        url = args.url
-        if not url:
-            url = input(f"{Colors.BOLD}Enter URL (e.g., app.example.com): {Colors.ENDC}").strip()
-            if not url:
-                print(f"{Colors.RED}URL is required{Colors.ENDC}")
-                sys.exit(1)
-        
-        # Domain selection
-        domain = args.domain
-        if not domain:
-            # Extract suggested domain from URL
-            import re
-            suggested_domain = None
-            domain_match = re.search(r'([^.]+\.[^.]+)$', url)
-            if domain_match:
-                suggested_domain = domain_match.group(1)
-            
-            print(f"\n{Colors.BOLD}Select domain for DNS record:{Colors.ENDC}")
-            print(f"Common domains: termkit.dev, exalted.dev, quale.app")
-            if suggested_domain:
-                domain = input(f"{Colors.BOLD}Enter domain (default: {suggested_domain}): {Colors.ENDC}").strip()
-                if not domain:
-                    domain = suggested_domain
-            else:
-                domain = input(f"{Colors.BOLD}Enter domain: {Colors.ENDC}").strip()
-        
-        # Auto-start prompt
-        if not args.no_start:
-            auto_start = input(f"{Colors.BOLD}Start tunnel after creation? (Y/n): {Colors.ENDC}").strip().lower()
-            auto_start = auto_start != 'n'
-        else:
-            auto_start = False
+        create_args = prompt_create_inputs(
+            name=args.tunnel, port=args.port, url=args.url, domain=args.domain, no_start=args.no_start
+        )
+        if not create_args:
+            sys.exit(1)
         
-        manager.create_tunnel(tunnel_name, port, url, auto_start=auto_start, domain_selection=domain)
+        manager.create_tunnel(
+            create_args.name,
+            create_args.port,
+            create_args.url,
+            auto_start=create_args.auto_start,
+            domain_selection=create_args.domain
+        )
     
     elif args.command == 'update':
+        if not args.port and not args.url:
+            command_parsers['update'].error('no updates specified, use -p for port or -u for URL')
         if not select_certificate_interactive(manager):
             sys.exit(1)
         manager.update_tunnel(args.tunnel, port=args.port, url=args.url, restart=args.restart)
@@ -832,12 +1220,13 @@ Examples:
                 print(f"{Colors.YELLOW}No tunnels available to delete{Colors.ENDC}")
                 sys.exit(0)
             
-            print(f"\n{Colors.BOLD}Available tunnels:{Colors.ENDC}")
-            for i, tunnel in enumerate(tunnels, 1):
-                status = "Running" if manager.is_tunnel_running(tunnel['name'])[0] else "Stopped"
-                print(f"  {i}. {tunnel['name']} ({status})")
+            running = manager.running_tunnels()
+            print(f"\n{Colors.BOLD}Available tunnels:{Colors.ENDC}\n" + "\n".join(
+                f"  {i}. {tunnel['name']} ({'Running' if tunnel['name'] in running else 'Stopped'})"
+                for i, tunnel in enumerate(tunnels, 1)
+            ))
             
-            choice = input(f"\n{Colors.BOLD}Select tunnel to delete (number or name): {Colors.ENDC}").strip()
+            choice = input(PROMPT_DELETE_CHOICE).strip()
             
             try:
                 idx = int(choice) - 1
@@ -865,7 +1254,8 @@ def select_certificate_interactive(manager: TunnelManager) -> bool:
     if manager.cert_file:
         return True  # Already have a cert
 
-    cert_files = list((Path.home() / ".cloudflared").glob("*-cert.pem"))
+    cert_dir = Path.home() / ".cloudflared"
+    cert_files = [cert_dir / name for name in list_cert_files(cert_dir) if name.endswith("-cert.pem")]
 
     if not cert_files:
         print(f"{Colors.RED}No certificate files found in ~/.cloudflared/{Colors.ENDC}")
@@ -878,9 +1268,9 @@ def select_certificate_interactive(manager: TunnelManager) -> bool:
         return True
     
     # Multiple certs - ask user to select
-    print(f"\n{Colors.BOLD}Available certificate files:{Colors.ENDC}")
-    for i, cert in enumerate(cert_files, 1):
-        print(f"  {i}. {cert.name}")
+    print(f"\n{Colors.BOLD}Available certificate files:{Colors.ENDC}\n" + "\n".join(
+        f"  {i}. {cert.name}" for i, cert in enumerate(cert_files, 1)
+    ))
     
     while True:
         choice = input(f"\n{Colors.BOLD}Select certificate (1-{len(cert_files)}): {Colors.ENDC}").strip()
@@ -895,6 +1285,59 @@ def select_certificate_interactive(manager: TunnelManager) -> bool:
         except ValueError:
             print(f"{Colors.RED}Please enter a number{Colors.ENDC}")
 
+@dataclass
+class CreateArgs:
+    """Inputs for TunnelManager.create_tunnel gathered by prompt_create_inputs"""
+    name: str
+    port: int
+    url: str
+    domain: str
+    auto_start: bool
+
+def prompt_create_inputs(name: Optional[str] = None, port: Optional[int] = None, url: Optional[str] = None,
+                         domain: Optional[str] = None, no_start: bool = False) -> Optional[CreateArgs]:
+    """Prompt for any create-tunnel values not already given. Returns None on invalid input."""
+    if not name:
+        name = input(PROMPT_TUNNEL_NAME).strip()
+        if not name:
+            print(f"{Colors.RED}Tunnel name is required{Colors.ENDC}")
+            return None
+    
+    if not port:
+        try:
+            port = port_number(input(PROMPT_PORT))
+        except argparse.ArgumentTypeError as e:
+            print(f"{Colors.RED}{e}{Colors.ENDC}")
+            return None
+    
+    if not url:
+        url = input(PROMPT_URL).strip()
+        if not url:
+            print(f"{Colors.RED}URL is required{Colors.ENDC}")
+            return None
+    
+    # Domain selection
+    if not domain:
+        # Extract suggested domain from URL
+        suggested_domain = base_domain(url)
+        
+        print(f"\n{Colors.BOLD}Select domain for DNS record:{Colors.ENDC}")
+        print(f"Common domains: termkit.dev, exalted.dev, quale.app")
+        if suggested_domain:
+            domain = input(f"{Colors.BOLD}Enter domain (default: {suggested_domain}): {Colors.ENDC}").strip()
+            if not domain:
+                domain = suggested_domain
+        else:
+            domain = input(PROMPT_DOMAIN).strip()
+    
+    # Auto-start prompt
+    if not no_start:
+        auto_start = input(PROMPT_AUTO_START).strip().lower() != 'n'
+    else:
+        auto_start = False
+    
+    return CreateArgs(name=name, port=port, url=url, domain=domain, auto_start=auto_start)
+
 def interactive_menu(manager: TunnelManager):
     """Interactive menu for tunnel management"""
     # If no cert was specified, ask user to select
@@ -902,19 +1345,11 @@ def interactive_menu(manager: TunnelManager):
         return
     
     while True:
-        print(f"\n{Colors.BOLD}{Colors.CYAN}=== Cloudflare Tunnel Manager ==={Colors.ENDC}")
-        print("1. List all tunnels")
-        print("2. Start a tunnel")
-        print("3. Stop a tunnel")
-        print("4. Restart a tunnel")
-        print("5. View tunnel logs")
-        print("6. Create a new tunnel")
-        print("7. Update a tunnel")
-        print("8. Delete a tunnel")
-        print("9. Exit")
+        sys.stdout.write(MENU_TEXT)
+        sys.stdout.flush()
         
         try:
-            choice = input(f"\n{Colors.BOLD}Select option (1-9): {Colors.ENDC}").strip()
+            choice = input(PROMPT_MENU_CHOICE).strip()
             
             if choice == '1':
                 manager.show_status()
@@ -925,11 +1360,11 @@ def interactive_menu(manager: TunnelManager):
                     print(f"{Colors.YELLOW}No tunnels available{Colors.ENDC}")
                     continue
                 
-                print(f"\n{Colors.BOLD}Available tunnels:{Colors.ENDC}")
-                for i, tunnel in enumerate(tunnels, 1):
-                    print(f"  {i}. {tunnel['name']}")
+                print(f"\n{Colors.BOLD}Available tunnels:{Colors.ENDC}\n" + "\n".join(
+                    f"  {i}. {tunnel['name']}" for i, tunnel in enumerate(tunnels, 1)
+                ))
                 
-                tunnel_choice = input(f"\n{Colors.BOLD}Enter tunnel number or name: {Colors.ENDC}").strip()
+                tunnel_choice = input(PROMPT_TUNNEL_CHOICE).strip()
                 
                 try:
                     idx = int(tunnel_choice) - 1
@@ -941,90 +1376,61 @@ def interactive_menu(manager: TunnelManager):
                 except ValueError:
                     tunnel_name = tunnel_choice
                 
-                config = input(f"{Colors.BOLD}Config file path (press Enter to skip): {Colors.ENDC}").strip()
+                config = input(PROMPT_CONFIG_PATH).strip()
                 manager.start_tunnel(tunnel_name, config if config else None)
             
             elif choice == '3':
-                tunnel_name = input(f"{Colors.BOLD}Enter tunnel name to stop: {Colors.ENDC}").strip()
+                tunnel_name = input(PROMPT_STOP_TUNNEL).strip()
                 if tunnel_name:
                     manager.stop_tunnel(tunnel_name)
             
             elif choice == '4':
-                tunnel_name = input(f"{Colors.BOLD}Enter tunnel name to restart: {Colors.ENDC}").strip()
+                tunnel_name = input(PROMPT_RESTART_TUNNEL).strip()
                 if tunnel_name:
-                    config = input(f"{Colors.BOLD}Config file path (press Enter to skip): {Colors.ENDC}").strip()
+                    config = input(PROMPT_CONFIG_PATH).strip()
                     manager.restart_tunnel(tunnel_name, config if config else None)
             
             elif choice == '5':
-                tunnel_name = input(f"{Colors.BOLD}Enter tunnel name: {Colors.ENDC}").strip()
+                tunnel_name = input(PROMPT_TUNNEL_NAME).strip()
                 if tunnel_name:
-                    lines = input(f"{Colors.BOLD}Number of lines (default 50): {Colors.ENDC}").strip()
-                    manager.tail_logs(tunnel_name, int(lines) if lines.isdigit() else 50)
+                    lines = input(PROMPT_LOG_LINES).strip()
+                    manager.tail_logs(tunnel_name, parse_pos_int(lines) or 50)
             
             elif choice == '6':
-                tunnel_name = input(f"{Colors.BOLD}Enter tunnel name for the new tunnel: {Colors.ENDC}").strip()
-                if not tunnel_name:
-                    print(f"{Colors.RED}Tunnel name is required{Colors.ENDC}")
-                    continue
-                
-                port_str = input(f"{Colors.BOLD}Enter local port number: {Colors.ENDC}").strip()
-                if not port_str.isdigit():
-                    print(f"{Colors.RED}Invalid port number{Colors.ENDC}")
-                    continue
-                port = int(port_str)
-                
-                url = input(f"{Colors.BOLD}Enter URL (e.g., example.com or subdomain.example.com): {Colors.ENDC}").strip()
-                if not url:
-                    print(f"{Colors.RED}URL is required{Colors.ENDC}")
+                create_args = prompt_create_inputs()
+                if not create_args:
                     continue
                 
-                # Extract domain from URL for suggestion
-                import re
-                suggested_domain = None
-                domain_match = re.search(r'([^.]+\.[^.]+)$', url)
-                if domain_match:
-                    suggested_domain = domain_match.group(1)
-                
-                # Ask for domain selection
-                print(f"\n{Colors.BOLD}Select domain for DNS record:{Colors.ENDC}")
-                print(f"Common domains: termkit.dev, exalted.dev, quale.app")
-                if suggested_domain:
-                    domain = input(f"{Colors.BOLD}Enter domain (default: {suggested_domain}): {Colors.ENDC}").strip()
-                    if not domain:
-                        domain = suggested_domain
-                else:
-                    domain = input(f"{Colors.BOLD}Enter domain: {Colors.ENDC}").strip()
-                
-                auto_start = input(f"{Colors.BOLD}Start tunnel after creation? (Y/n): {Colors.ENDC}").strip().lower()
-                auto_start = auto_start != 'n'
-                
-                manager.create_tunnel(tunnel_name, port, url, auto_start=auto_start, domain_selection=domain)
+                manager.create_tunnel(
+                    create_args.name,
+                    create_args.port,
+                    create_args.url,
+                    auto_start=create_args.auto_start,
+                    domain_selection=create_args.domain
+                )
             
             elif choice == '7':
-                tunnel_name = input(f"{Colors.BOLD}Enter tunnel name to update: {Colors.ENDC}").strip()
+                tunnel_name = input(PROMPT_UPDATE_TUNNEL).strip()
                 if not tunnel_name:
                     print(f"{Colors.RED}Tunnel name is required{Colors.ENDC}")
                     continue
                 
                 # Check if tunnel exists
-                tunnels = manager.list_tunnels()
-                if not any(t.get('name') == tunnel_name for t in tunnels):
+                if not manager.tunnel_exists(tunnel_name):
                     print(f"{Colors.RED}Tunnel '{tunnel_name}' does not exist{Colors.ENDC}")
                     continue
                 
                 # Get current config
+                current_port = current_url = "unknown"
                 config_path = manager.config_dir / f"{tunnel_name}.yml"
                 if config_path.exists():
                     with open(config_path, 'r') as f:
                         config_content = f.read()
                     
                     # Extract current values
-                    import re
-                    port_match = re.search(r'service:\s*http://localhost:(\d+)', config_content)
-                    current_port = int(port_match.group(1)) if port_match else "unknown"
-                    
-                    url_match = re.search(r'hostname:\s*([^\s]+)', config_content)
-                    current_url = url_match.group(1) if url_match else "unknown"
+                    port, url, _ = parse_tunnel_config(config_content)
+                    current_port = port or "unknown"
+                    current_url = url or "unknown"
                     
                     print(f"\nCurrent configuration:")
                     print(f"  Port: {current_port}")
@@ -1033,7 +1439,11 @@ def interactive_menu(manager: TunnelManager):
                 print(f"\n{Colors.BOLD}Leave blank to keep current value{Colors.ENDC}")
                 
                 port_str = input(f"{Colors.BOLD}New port number (current: {current_port}): {Colors.ENDC}").strip()
-                new_port = int(port_str) if port_str.isdigit() else None
+                try:
+                    new_port = port_number(port_str) if port_str else None
+                except argparse.ArgumentTypeError as e:
+                    print(f"{Colors.RED}{e}{Colors.ENDC}")
+                    continue
                 
                 new_url = input(f"{Colors.BOLD}New URL (current: {current_url}): {Colors.ENDC}").strip()
                 new_url = new_url if new_url else None
@@ -1042,13 +1452,13 @@ def interactive_menu(manager: TunnelManager):
                     print(f"{Colors.YELLOW}No changes specified{Colors.ENDC}")
                     continue
                 
-                restart = input(f"{Colors.BOLD}Restart tunnel after update? (Y/n): {Colors.ENDC}").strip().lower()
+                restart = input(PROMPT_RESTART_AFTER_UPDATE).strip().lower()
                 restart = restart != 'n'
                 
                 manager.update_tunnel(tunnel_name, port=new_port, url=new_url, restart=restart)
             
             elif choice == '8':
-                tunnel_name = input(f"{Colors.BOLD}Enter tunnel name to delete: {Colors.ENDC}").strip()
+                tunnel_name = input(PROMPT_DELETE_TUNNEL).strip()
                 if not tunnel_name:
                     print(f"{Colors.RED}Tunnel name is required{Colors.ENDC}")
                     continue